@@ -1,6 +1,5 @@
 import argparse
 import asyncio
-import time
 
 import aiohttp
 
@@ -10,11 +9,7 @@ from radiacode import RealTimeData, RadiaCode
 def sensors_data(rc_conn):
     databuf = rc_conn.data_buf()
 
-    last = None
-    for v in databuf:
-        if isinstance(v, RealTimeData):
-            if last is None or last.dt < v.dt:
-                last = v
+    last = max((v for v in databuf if isinstance(v, RealTimeData)), key=lambda v: v.dt, default=None)
 
     if last is None:
         return []
@@ -38,11 +33,31 @@ def sensors_data(rc_conn):
     ]
 
 
-async def send_data(d):
+async def send_data(session, d):
+    async with session.post('https://narodmon.ru/json', json=d) as resp:
+        return await resp.text()
+
+
+async def send_loop(rc_conn, device_data, interval, verbose):
+    # payload layout is fixed, only the sensors list changes between sends
+    device = {**device_data, 'sensors': []}
+    d = {'devices': [device]}
+
     # use aiohttp because we already have it as dependency in webserver.py, don't want add 'requests' here
-    async with aiohttp.ClientSession() as session:
-        async with session.post('https://narodmon.ru/json', json=d) as resp:
-            return await resp.text()
+    # single session for all sends, so the connection pool can reuse the HTTPS connection
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30)) as session:
+        while True:
+            device['sensors'] = sensors_data(rc_conn)
+            if verbose:
+                print(f'Sending {d}')
+
+            try:
+                r = await send_data(session, d)
+                print(f'NarodMon Response: {r}')
+            except Exception as ex:
+                print(f'NarodMon send error: {ex}')
+
+            await asyncio.sleep(interval)
 
 
 def main():
@@ -50,6 +65,7 @@ def main():
     parser.add_argument('--bluetooth-mac', type=str, required=True, help='MAC address of radiascan device')
     parser.add_argument('--connection', choices=['usb', 'bluetooth'], default='bluetooth', help='device connection type')
     parser.add_argument('--interval', type=int, required=False, default=600, help='send interval, seconds')
+    parser.add_argument('--verbose', action='store_true', help='print every payload sent to narodmon')
     args = parser.parse_args()
 
     if args.connection == 'usb':
@@ -64,24 +80,7 @@ def main():
         'name': 'RadiaCode-101',
     }
 
-    while True:
-        d = {
-            'devices': [
-                {
-                    **device_data,
-                    'sensors': sensors_data(rc_conn),
-                },
-            ],
-        }
-        print(f'Sending {d}')
-
-        try:
-            r = asyncio.run(send_data(d))
-            print(f'NarodMon Response: {r}')
-        except Exception as ex:
-            print(f'NarodMon send error: {ex}')
-
-        time.sleep(args.interval)
+    asyncio.run(send_loop(rc_conn, device_data, args.interval, args.verbose))
 
 
 if __name__ == '__main__':
@@ -39,8 +39,10 @@
 """
 
 import argparse
+import ast
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import yaml
 import matplotlib as mpl
@@ -87,8 +89,8 @@ def plot_RC102Spectrum():
 
     def Chan2En(C):
         # convert Channel number to Energy
-        #  E = a0 + a1*C + a2 C^2
-        return a0 + a1 * C + a2 * C**2
+        #  E = a0 + a1*C + a2 C^2, in Horner form
+        return a0 + C * (a1 + a2 * C)
 
     def En2Chan(E):
         # convert Energies to Channel Numbers
@@ -102,6 +104,18 @@ def plot_RC102Spectrum():
         print('    !!! Graphics window closed')
         mpl_active = False
 
+    def update_ylim(ax, lo, hi):
+        # noisy per-tick data: new limits with headroom only when the data leaves the current range
+        # or shrinks below a third of it, so most ticks keep the limits and can be blitted
+        ylo, yhi = ax.get_ylim()
+        if lo < ylo or hi > yhi or hi < ylo + (yhi - ylo) / 3:
+            ax.set_ylim(min(0.0, lo), hi + (0.5 * (hi - lo) or 1.0))
+
+    def update_text(text, s):
+        # most statistics strings repeat from tick to tick, skip re-layout of unchanged texts
+        if text.get_text() != s:
+            text.set_text(s)
+
     # end helpers ---------------------------------------
 
     # ------
@@ -134,7 +148,7 @@ def plot_RC102Spectrum():
     filename = args.file + '_' + timestamp + '.yaml' if args.file != '' else ''
     NHistory = args.history
     run_time = args.time
-    rate_history = np.zeros(NHistory)
+    rate_history = np.full(NHistory, np.nan)  # chronological, newest rate last
 
     if not quiet:
         print(f'\n *==* script {sys.argv[0]} executing')
@@ -151,7 +165,7 @@ def plot_RC102Spectrum():
     rc = RadiaCode(bluetooth_mac=bluetooth_mac, serial_number=serial_number)
     serial = rc.serial_number()
     fw_version = rc.fw_version()
-    status_flags = eval(rc.status().split(':')[1])[0]
+    status_flags = ast.literal_eval(rc.status().split(':')[1].strip())[0]  # "status flags: (N,)"
     a0, a1, a2 = rc.energy_calib()
     # get initial spectrum and meta-data
     if reset_device_spectrum:
@@ -160,11 +174,13 @@ def plot_RC102Spectrum():
     # print(f'### Spectrum: {spectrum}')
     counts0 = np.asarray(spectrum.counts)
     NChannels = len(counts0)
-    Channels = np.asarray(range(NChannels)) + 0.5
+    Channels = np.arange(NChannels, dtype=np.float64) + 0.5
     Energies = Chan2En(Channels)
+    # rows (1, E) give number of counts and deposited energy of a spectrum in one product;
+    # single precision halves the memory traffic
+    count_energy_weights = np.stack((np.ones(NChannels), Energies)).astype(np.float32)
     duration_s = spectrum.duration.total_seconds()
-    _t0 = time.time()
-    t_start = _t0  # start time of acquisition from device
+    t_start = time.monotonic()  # start time of acquisition from device
 
     print(f'### Found device with serial number: {serial}')
     print(f'    Firmware: {fw_version}')
@@ -217,7 +233,7 @@ def plot_RC102Spectrum():
     line.set_xdata(Energies)
     (line_diff,) = axEdiff.plot([1], [0.5], color=appColors.line1)
     line_diff.set_xdata(Energies)
-    hrates = num_history_points * [None]
+    hrates = np.full(num_history_points, np.nan)  # kept in display order, newest value last
     _xplt = np.linspace(-num_history_points * dt_wait, 0.0, num_history_points)
     (line_rate,) = axRate.plot(_xplt, hrates, '.--', lw=1, markersize=4, color=appColors.line1, mec=appColors.marker1)
     line_avrate = axRate.axhline(0.0, linestyle='--', lw=1, color=appColors.auxline)
@@ -254,6 +270,24 @@ def plot_RC102Spectrum():
         alpha=0.7,
     )
 
+    # animated artists are left out of normal draws and blitted over a cached background
+    animated_artists = (line, line_diff, line_rate, line_avrate, text_active, text_cum_statistics, text_diff_statistics)
+    for a in animated_artists:
+        a.set_animated(True)
+    background = None
+
+    def draw_animated():
+        for a in animated_artists:
+            fig.draw_artist(a)
+
+    def on_draw(event):
+        # every full redraw (first show, resize, new axis limits) renews the cached background
+        nonlocal background
+        background = fig.canvas.copy_from_bbox(fig.bbox)
+        draw_animated()
+
+    fig.canvas.mpl_connect('draw_event', on_draw)
+
     # plot in non-blocking mode
     plt.ion()  # interactive mode, non-blocking
     plt.show()
@@ -266,74 +300,94 @@ def plot_RC102Spectrum():
 
     toggle = ['  \\ ', '  | ', '  / ', '  - ']
     itoggle = 0
-    icount = -1
+    _last_print = 0.0  # time of last status output to terminal
     total_time = 0
     previous_counts = counts0.copy()
+    # filled in place by every read-out
+    actual_counts = np.empty_like(counts0)
+    counts_diff = np.empty_like(counts0)
+    counts_diff32 = np.empty(NChannels, dtype=np.float32)  # single precision copy for the weighted sums
     if restart_accumulation:
-        counts = np.zeros(len(counts0))
+        counts = np.zeros_like(counts0)
         T0 = t_start
     else:
-        counts = counts0.copy()
+        counts = counts0  # counts0 is not needed any more, accumulate in place
         T0 = t_start - duration_s  # start time of accumulation
 
-    countsum0 = np.sum(counts)
-
-    time.sleep(dt_wait - time.time() + t_start)
+    # running totals, updated incrementally from counts_diff in the loop
+    countsum = np.sum(counts)
+    deposited_energy = np.dot(counts, Energies)  # in keV
+
+    # device read-out runs in a worker thread and overlaps with statistics and drawing,
+    # every tick processes the spectrum requested at the start of the previous one
+    reader = ThreadPoolExecutor(max_workers=1)
+    next_deadline = t_start + dt_wait
+    time.sleep(max(0.0, next_deadline - time.monotonic()))
+    _t_read = time.monotonic()  # time of read-out request
+    next_spectrum = reader.submit(rc.spectrum)
     try:
         while total_time < run_time and mpl_active:
-            _t = time.time()  # start time of loop
-            icount += 1
-            # dt = _t - _t0  # last time interval
-            _t0 = _t
-            total_time = int(10 * (_t - T0)) / 10  # active time rounded to 0.1s
-            spectrum = rc.spectrum()
-            actual_counts = np.asarray(spectrum.counts)
-            if not any(actual_counts):
+            next_deadline += dt_wait
+            spectrum = next_spectrum.result()
+            total_time = int(10 * (_t_read - T0)) / 10  # active time rounded to 0.1s
+            _t_read = time.monotonic()
+            next_spectrum = reader.submit(rc.spectrum)
+            np.copyto(actual_counts, spectrum.counts)
+            if not actual_counts.any():
                 time.sleep(dt_wait)
                 print(' accumulation time:', total_time, ' s', ' !!! waiting for data', end='\r')
                 continue
-            counts_diff = actual_counts - previous_counts
+            np.subtract(actual_counts, previous_counts, out=counts_diff)
             previous_counts[:] = actual_counts
             counts += counts_diff
             # some statistics
-            countsum = np.sum(counts)
-            rate = (countsum - countsum0) / dt_wait
-            rate_history[icount % NHistory] = rate
+            np.copyto(counts_diff32, counts_diff)
+            ndiff, depE = (count_energy_weights @ counts_diff32).tolist()  # depE in keV
+            countsum += ndiff
+            rate = ndiff / dt_wait
+            rate_history[:-1] = rate_history[1:]
+            rate_history[-1] = rate
             rate_av = countsum / total_time
-            hrates[icount % num_history_points] = rate
-            depE = np.sum(counts_diff * Energies)  # in keV
             doserate = depE * depositedE2doserate / dt_wait
             # dose in µGy/h = µJ/(kg*h)
-            deposited_energy = np.sum(counts * Energies)  # in keV
+            deposited_energy += depE
             total_dose = deposited_energy * depositedE2dose
             av_doserate = deposited_energy * depositedE2doserate / total_time
-
-            countsum0 = countsum
             # update graphics
+            ylims = [ax.get_ylim() for ax in (axE, axEdiff, axRate)]
             line.set_ydata(counts)
-            axE.relim()
-            axE.autoscale_view()
+            # cumulative counts only grow, set new limits with headroom when they come close to the upper one
+            counts_max = counts.max()
+            if counts_max > 0.95 * axE.get_ylim()[1]:
+                axE.set_ylim(0.5, 2.0 * counts_max)
             line_diff.set_ydata(counts_diff)
-            axEdiff.relim()
-            axEdiff.autoscale_view()
-            k = icount % num_history_points
-            line_rate.set_ydata(np.concatenate((hrates[k + 1 :], hrates[: k + 1])))
-            axRate.relim()
-            axRate.autoscale_view()
+            update_ylim(axEdiff, counts_diff.min(), counts_diff.max())
+            hrates[:-1] = hrates[1:]
+            hrates[-1] = rate
+            line_rate.set_ydata(hrates)
             line_avrate.set_ydata([rate_av])
+            update_ylim(axRate, min(np.nanmin(hrates), rate_av), max(np.nanmax(hrates), rate_av))
 
-            text_active.set_text('accumulation time: ' + str(total_time) + 's')
-            text_cum_statistics.set_text(
+            update_text(text_active, 'accumulation time: ' + str(total_time) + 's')
+            update_text(
+                text_cum_statistics,
                 f'counts: {countsum:.5g}\n'
                 + f'av. rate: {rate_av:.3g} Hz\n'
                 + f'dose: {total_dose:.3g} µGy  \n'
-                + f'av. doserate: {av_doserate:.3g} µGy/h'
+                + f'av. doserate: {av_doserate:.3g} µGy/h',
             )
-            text_diff_statistics.set_text(f'rate: {rate:.3g} Hz\n' + f'dose: {doserate:.3g} µGy/h')
-            # draw data
-            fig.canvas.draw_idle()
-            # update status text in terminal
-            if not quiet:
+            update_text(text_diff_statistics, f'rate: {rate:.3g} Hz\n' + f'dose: {doserate:.3g} µGy/h')
+            # draw data, the full figure only if axis limits changed
+            if background is None or ylims != [ax.get_ylim() for ax in (axE, axEdiff, axRate)]:
+                fig.canvas.draw_idle()
+            else:
+                fig.canvas.restore_region(background)
+                draw_animated()
+                fig.canvas.blit(fig.bbox)
+            # update status text in terminal, at most 5 times per second for short intervals
+            _now = time.monotonic()
+            if not quiet and _now - _last_print >= 0.2:
+                _last_print = _now
                 print(
                     toggle[itoggle],
                     ' active:',
@@ -343,9 +397,9 @@ def plot_RC102Spectrum():
                     '    (<ctrl>+c to stop)      ',
                     end='\r',
                 )
-            itoggle = itoggle + 1 if itoggle < 3 else 0
+                itoggle = itoggle + 1 if itoggle < 3 else 0
             # wait for corrected wait interval)
-            fig.canvas.start_event_loop(max(0.9 * dt_wait, dt_wait * (icount + 2) - (time.time() - t_start)))
+            fig.canvas.start_event_loop(max(0.9 * dt_wait, next_deadline - time.monotonic()))
         # --> end while true
 
         print('\n' + sys.argv[0] + ': exit after ', total_time, ' s of data accumulation ...')
@@ -354,19 +408,20 @@ def plot_RC102Spectrum():
         print('\n' + sys.argv[0] + ': keyboard interrupt - ending ...')
 
     finally:  # store data
+        reader.shutdown()
         if filename != '':
             print(22 * ' ' + '... storing data to yaml file ->  ', filename)
             d = dict(
                 active_time=total_time,
                 interval=dt_wait,
-                rates=rate_history[: icount + 1].tolist()
-                if icount < NHistory
-                else np.concatenate((rate_history[icount + 1 :], rate_history[: icount + 1])).tolist(),
+                rates=rate_history[~np.isnan(rate_history)].tolist(),
                 ecal=[a0, a1, a2],
-                spectrum=counts.tolist(),
             )
             with open(filename, 'w') as f:
-                f.write(yaml.dump(d, default_flow_style=None))
+                # libyaml based dumper if available, the pure python one is slow on long spectra
+                yaml.dump(d, f, Dumper=getattr(yaml, 'CSafeDumper', yaml.SafeDumper), default_flow_style=None)
+                # the spectrum is by far the largest entry, written directly as flow sequence (last key when sorted)
+                f.write('spectrum: [' + ', '.join(counts.astype(np.int64).astype(str)) + ']\n')
 
         if mpl_active:
             input('    type <ret> to close down graphics window  --> ')
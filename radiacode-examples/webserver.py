@@ -2,6 +2,7 @@ import argparse
 import asyncio
 import json
 import pathlib
+from collections import deque
 
 from aiohttp import web
 
@@ -45,37 +46,75 @@ async def handle_spectrum_reset(request):
     return web.json_response({})
 
 
+async def close_ws(ws):
+    # close() waits for the peer and can stall on the same client whose send just failed
+    try:
+        await asyncio.wait_for(ws.close(), timeout=2.0)
+    except Exception as ex:
+        print(f'Websocket client did not close cleanly: {ex!r}')
+
+
+async def send_rates(ws, jdata, send_limit, closing):
+    # a slow or broken client must not stall the broadcast to everyone else;
+    # closing the socket ends its handle_ws() loop, which removes it from app.ws_clients
+    async with send_limit:
+        try:
+            await asyncio.wait_for(ws.send_bytes(jdata), timeout=2.0)
+            return
+        except Exception as ex:
+            print(f'Dropping websocket client: {ex!r}')
+    # closing runs in its own task, off the broadcast path and outside of send_limit
+    task = asyncio.create_task(close_ws(ws))
+    closing.add(task)
+    task.add_done_callback(closing.discard)
+
+
 async def process(app):
     max_history_size = 128
-    history = []
+    # caps the number of sends buffered at once when many clients are connected
+    send_limit = asyncio.Semaphore(50)
+    # references to pending close() tasks of dropped clients, the event loop keeps only weak ones
+    closing = set()
+    # data_buf() returns records in time order, the deques drop the oldest points on their own;
+    # chart points are computed once, when a record arrives
+    countrate_series = deque(maxlen=max_history_size)
+    doserate_series = deque(maxlen=max_history_size)
     while True:
         databuf = app.rc_conn.data_buf()
         for v in databuf:
             if isinstance(v, RealTimeData):
-                history.append(v)
+                ts = int(1000 * v.dt.timestamp())
+                countrate_series.append((ts, v.count_rate))
+                doserate_series.append((ts, 10000 * v.dose_rate))
 
-        history.sort(key=lambda x: x.dt)
-        history = history[-max_history_size:]
+        # encoded once and sent as a binary frame to every client, send_str() would re-encode it per client
         jdata = json.dumps(
             {
                 'series': [
                     {
                         'name': 'countrate',
-                        'data': [(int(1000 * x.dt.timestamp()), x.count_rate) for x in history],
+                        'data': list(countrate_series),
                     },
                     {
                         'name': 'doserate',
-                        'data': [(int(1000 * x.dt.timestamp()), 10000 * x.dose_rate) for x in history],
+                        'data': list(doserate_series),
                     },
                 ],
             },
-        )
+        ).encode()
         print(f'Rates updated, sending to {len(app.ws_clients)} connected clients')
-        await asyncio.gather(*[ws.send_str(jdata) for ws in app.ws_clients], asyncio.sleep(1.0))
+        await asyncio.gather(*[send_rates(ws, jdata, send_limit, closing) for ws in app.ws_clients], asyncio.sleep(1.0))
 
 
 async def on_startup(app):
-    asyncio.create_task(process(app))
+    app.process_task = asyncio.create_task(process(app))
+
+
+# web.run_app already handles SIGINT/SIGTERM, cleanup only needs to hook into its shutdown sequence
+async def on_shutdown(app):
+    app.process_task.cancel()
+    for ws in list(app.ws_clients):
+        await ws.close(code=web.WSCloseCode.GOING_AWAY, message=b'Server shutdown')
 
 
 if __name__ == '__main__':
@@ -95,6 +134,7 @@ if __name__ == '__main__':
         app.rc_conn = RadiaCode()
 
     app.on_startup.append(on_startup)
+    app.on_shutdown.append(on_shutdown)
     app.add_routes(
         [
             web.get('/', handle_index),
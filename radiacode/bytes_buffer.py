@@ -1,8 +1,22 @@
 import struct
+from functools import lru_cache
+from typing import Union
+
+
+# compiled Struct per format string, decoders unpack the same handful of formats over and over
+@lru_cache(maxsize=256)
+def _struct(fmt: str) -> struct.Struct:
+    return struct.Struct(fmt)
+
+
+_U16 = struct.Struct('<H')
+_U32 = struct.Struct('<I')
+_F32 = struct.Struct('<f')
 
 
 class BytesBuffer:
-    def __init__(self, data: bytes):
+    # bytearray is accepted as is, so transports can hand over the assembled response without a copy
+    def __init__(self, data: Union[bytes, bytearray]):
         self._data = data
         self._pos = 0
 
@@ -12,13 +26,30 @@ class BytesBuffer:
     def data(self):
         return self._data[self._pos :]
 
-    def unpack(self, fmt):
-        sz = struct.calcsize(fmt)
+    def _advance(self, sz: int, what: str) -> int:
         if self._pos + sz > len(self._data):
-            raise Exception(f'BytesBuffer: {sz} bytes required for {fmt}, but have only {len(self._data) - self._pos}')
+            raise Exception(f'BytesBuffer: {sz} bytes required for {what}, but have only {len(self._data) - self._pos}')
         self._pos += sz
-        return struct.unpack_from(fmt, self._data, self._pos - sz)
+        return self._pos - sz
+
+    def unpack(self, fmt):
+        s = _struct(fmt)
+        return s.unpack_from(self._data, self._advance(s.size, fmt))
+
+    # fast paths for single little-endian values, no format lookup and no 1-tuple
+    def read_u8(self) -> int:
+        return self._data[self._advance(1, 'u8')]
+
+    def read_u16(self) -> int:
+        return _U16.unpack_from(self._data, self._advance(2, 'u16'))[0]
+
+    def read_u32(self) -> int:
+        return _U32.unpack_from(self._data, self._advance(4, 'u32'))[0]
+
+    def read_f32(self) -> float:
+        return _F32.unpack_from(self._data, self._advance(4, 'f32'))[0]
 
     def unpack_string(self) -> str:
-        slen = self.unpack('<B')[0]
-        return self.unpack(f'<{slen}s')[0].decode('ascii')
+        slen = self.read_u8()
+        pos = self._advance(slen, 'string')
+        return self._data[pos : pos + slen].decode('ascii')
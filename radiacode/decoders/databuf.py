@@ -1,5 +1,5 @@
 import datetime
-from typing import List, Union
+from typing import Dict, List, Union
 
 from radiacode.bytes_buffer import BytesBuffer
 from radiacode.types import DoseRateDB, Event, RareData, RawData, RealTimeData
@@ -11,9 +11,13 @@ def decode_VS_DATA_BUF(
 ) -> List[Union[RealTimeData, DoseRateDB, RareData, RawData, Event]]:
     ret: List[Union[RealTimeData, DoseRateDB, RareData, RawData, Event]] = []
     next_seq = None
+    # records of one sample share ts_offset, build each datetime only once
+    dt_cache: Dict[int, datetime.datetime] = {}
     while br.size() > 0:
         seq, eid, gid, ts_offset = br.unpack('<BBBi')
-        dt = base_time + datetime.timedelta(milliseconds=ts_offset)
+        dt = dt_cache.get(ts_offset)
+        if dt is None:
+            dt = dt_cache[ts_offset] = base_time + datetime.timedelta(milliseconds=ts_offset)
         if next_seq is not None and next_seq != seq:
             raise Exception(f'seq jump, expect:{next_seq}, got:{seq}')
 
@@ -6,24 +6,22 @@ from radiacode.types import Spectrum
 
 
 def decode_counts_v0(br: BytesBuffer) -> List[int]:
-    ret = []
-    while br.size() > 0:
-        ret.append(br.unpack('<I')[0])
-    return ret
+    assert br.size() % 4 == 0, f'truncated spectrum: {br.size()} bytes is not a multiple of 4'
+    return list(br.unpack(f'<{br.size() // 4}I'))
 
 
 def decode_counts_v1(br: BytesBuffer) -> List[int]:
     ret = []
     last = 0
     while br.size() > 0:
-        u16 = br.unpack('<H')[0]
+        u16 = br.read_u16()
         cnt = (u16 >> 4) & 0x0FFF
         vlen = u16 & 0x0F
         for _ in range(cnt):
             if vlen == 0:
                 v = 0
             elif vlen == 1:
-                v = br.unpack('<B')[0]
+                v = br.read_u8()
             elif vlen == 2:
                 v = last + br.unpack('<b')[0]
             elif vlen == 3:
@@ -1,7 +1,9 @@
 import datetime
 import struct
 import platform
-from typing import List, Optional, Union
+from functools import reduce
+from operator import or_
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
 
 from radiacode.bytes_buffer import BytesBuffer
 from radiacode.decoders.databuf import decode_VS_DATA_BUF
@@ -10,27 +12,43 @@ from radiacode.transports.bluetooth import Bluetooth
 from radiacode.transports.usb import Usb
 from radiacode.types import CTRL, VS, VSFR, DisplayDirection, DoseRateDB, Event, RareData, RawData, RealTimeData, Spectrum
 
+if TYPE_CHECKING:
+    from radiacode.transports.bluetooth_async import BluetoothAsync
+
+# length prefix, then the 4-byte header echoed back in the response: reqtype, 0, seq
+_REQUEST_HEADER = struct.Struct('<I2sBB')
+# day, month, year - 2000, 0, second, minute, hour, 0
+_LOCAL_TIME = struct.Struct('<BBBBBBBB')
+
 
 # channel number -> kEv
+# Horner form, also accepts a numpy array of channels to compute the whole energy axis at once
 def spectrum_channel_to_energy(channel_number: int, a0: float, a1: float, a2: float) -> float:
-    return a0 + a1 * channel_number + a2 * channel_number * channel_number
+    return a0 + channel_number * (a1 + a2 * channel_number)
 
 
 class RadiaCode:
-    _connection: Union[Bluetooth, Usb]
+    _connection: Union[Bluetooth, 'BluetoothAsync', Usb]
 
     def __init__(
         self,
         bluetooth_mac: Optional[str] = None,
         serial_number: Optional[str] = None,
         ignore_firmware_compatibility_check: bool = False,
+        use_bleak: bool = False,
     ):
         self._seq = 0
+        self._config_cache: Optional[Tuple[str, Dict[str, str]]] = None
 
         # Bluepy doesn't support MacOS: https://github.com/IanHarvey/bluepy/issues/44
         self._bt_supported = platform.system() != 'Darwin'
 
-        if bluetooth_mac is not None and self._bt_supported is True:
+        if bluetooth_mac is not None and use_bleak is True:
+            # optional dependency, imported only when requested
+            from radiacode.transports.bluetooth_async import BluetoothAsync
+
+            self._connection = BluetoothAsync(bluetooth_mac)
+        elif bluetooth_mac is not None and self._bt_supported is True:
             self._connection = Bluetooth(bluetooth_mac)
         else:
             self._connection = Usb(serial_number=serial_number)
@@ -47,11 +65,7 @@ class RadiaCode:
                 f'Incompatible firmware version {vmaj}.{vmin}, >=4.8 required. Upgrade device firmware or use radiacode==0.2.2'
             )
 
-        self._spectrum_format_version = 0
-        for line in self.configuration().split('\n'):
-            if line.startswith('SpecFormatVersion'):
-                self._spectrum_format_version = int(line.split('=')[1])
-                break
+        self._spectrum_format_version = int(self._configuration()[1].get('SpecFormatVersion', '0'))
 
     def base_time(self) -> datetime.datetime:
         return self._base_time
@@ -61,9 +75,9 @@ class RadiaCode:
         req_seq_no = 0x80 + self._seq
         self._seq = (self._seq + 1) % 32
 
-        req_header = reqtype + b'\x00' + struct.pack('<B', req_seq_no)
-        request = req_header + (args or b'')
-        full_request = struct.pack('<I', len(request)) + request
+        args = args or b''
+        full_request = _REQUEST_HEADER.pack(4 + len(args), reqtype, 0, req_seq_no) + args
+        req_header = full_request[4:8]
 
         response = self._connection.execute(full_request)
         resp_header = response.unpack('<4s')[0]
@@ -73,24 +87,26 @@ class RadiaCode:
     def read_request(self, command_id: Union[int, VS, VSFR]) -> BytesBuffer:
         r = self.execute(b'\x26\x08', struct.pack('<I', int(command_id)))
         retcode, flen = r.unpack('<II')
-        assert retcode == 1, f'{command_id}: got retcode {retcode}'
+        assert retcode == 1, f'{command_id!r}: got retcode {retcode}'
         # HACK: workaround for new firmware bug(?)
         if r.size() == flen + 1 and r._data[-1] == 0x00:
             r._data = r._data[:-1]
         # END OF HACK
-        assert r.size() == flen, f'{command_id}: got size {r.size()}, expect {flen}'
+        assert r.size() == flen, f'{command_id!r}: got size {r.size()}, expect {flen}'
         return r
 
     def write_request(self, command_id: Union[int, VSFR], data: Optional[bytes] = None) -> None:
+        self._config_cache = None
         r = self.execute(b'\x25\x08', struct.pack('<I', int(command_id)) + (data or b''))
-        retcode = r.unpack('<I')[0]
+        retcode = r.read_u32()
         assert retcode == 1
         assert r.size() == 0
 
     def batch_read_vsfrs(self, vsfr_ids: List[VSFR]) -> List[int]:
         assert len(vsfr_ids)
-        r = self.execute(b'\x2a\x08', b''.join(struct.pack('<I', int(c)) for c in vsfr_ids))
-        ret = [r.unpack('<I')[0] for _ in range(len(vsfr_ids))]
+        n = len(vsfr_ids)
+        r = self.execute(b'\x2a\x08', struct.pack(f'<{n}I', *(int(c) for c in vsfr_ids)))
+        ret = list(r.unpack(f'<{n}I'))
         assert r.size() == 0
         return ret
 
@@ -101,12 +117,12 @@ class RadiaCode:
         return f'status flags: {flags}'
 
     def set_local_time(self, dt: datetime.datetime) -> None:
-        d = struct.pack('<BBBBBBBB', dt.day, dt.month, dt.year - 2000, 0, dt.second, dt.minute, dt.hour, 0)
+        d = _LOCAL_TIME.pack(dt.day, dt.month, dt.year - 2000, 0, dt.second, dt.minute, dt.hour, 0)
         self.execute(b'\x04\x0a', d)
 
     def fw_signature(self) -> str:
         r = self.execute(b'\x01\x01')
-        signature = r.unpack('<I')[0]
+        signature = r.read_u32()
         filename = r.unpack_string()
         idstring = r.unpack_string()
         return f'Signature: {signature:08X}, FileName="{filename}", IdString="{idstring}"'
@@ -122,15 +138,29 @@ class RadiaCode:
 
     def hw_serial_number(self) -> str:
         r = self.execute(b'\x0b\x00')
-        serial_len = r.unpack('<I')[0]
+        serial_len = r.read_u32()
         assert serial_len % 4 == 0
-        serial_groups = [r.unpack('<I')[0] for _ in range(serial_len // 4)]
+        serial_groups = r.unpack(f'<{serial_len // 4}I')
         assert r.size() == 0
         return '-'.join(f'{v:08X}' for v in serial_groups)
 
-    def configuration(self) -> str:
-        r = self.read_request(VS.CONFIGURATION)
-        return r.data().decode('cp1251')
+    # cached together with parsed key=value pairs until the next write_request/set_energy_calib,
+    # refresh=True re-reads it, e.g. after settings were changed on the device itself
+    def configuration(self, refresh: bool = False) -> str:
+        return self._configuration(refresh)[0]
+
+    def _configuration(self, refresh: bool = False) -> Tuple[str, Dict[str, str]]:
+        cache = self._config_cache
+        if refresh or cache is None:
+            r = self.read_request(VS.CONFIGURATION)
+            text = r.data().decode('cp1251')
+            values = {}
+            for line in text.split('\n'):
+                if '=' in line:
+                    k, v = line.split('=', 1)
+                    values[k.strip()] = v.strip()
+            cache = self._config_cache = (text, values)
+        return cache
 
     def text_message(self) -> str:
         r = self.read_request(VS.TEXT_MESSAGE)
@@ -165,7 +195,7 @@ class RadiaCode:
 
     def spectrum_reset(self) -> None:
         r = self.execute(b'\x27\x08', struct.pack('<II', int(VS.SPECTRUM), 0))
-        retcode = r.unpack('<I')[0]
+        retcode = r.read_u32()
         assert retcode == 1
         assert r.size() == 0
 
@@ -177,8 +207,9 @@ class RadiaCode:
     def set_energy_calib(self, coef: List[float]) -> None:
         assert len(coef) == 3
         pc = struct.pack('<fff', *coef)
+        self._config_cache = None
         r = self.execute(b'\x27\x08', struct.pack('<II', int(VS.ENERGY_CALIB), len(pc)) + pc)
-        retcode = r.unpack('<I')[0]
+        retcode = r.read_u32()
         assert retcode == 1
 
     def set_language(self, lang='ru') -> None:
@@ -195,10 +226,8 @@ class RadiaCode:
         self.write_request(VSFR.SOUND_ON, struct.pack('<I', bool(on)))
 
     def set_sound_ctrl(self, ctrls: List[CTRL]) -> None:
-        flags = 0
-        for c in ctrls:
-            flags |= int(c)
-        self.write_request(VSFR.SOUND_CTRL, struct.pack('<I', flags))
+        flags = reduce(or_, ctrls, CTRL(0))
+        self.write_request(VSFR.SOUND_CTRL, struct.pack('<I', int(flags)))
 
     def set_display_off_time(self, seconds: int) -> None:
         assert seconds in {5, 10, 15, 30}
@@ -214,8 +243,7 @@ class RadiaCode:
         self.write_request(VSFR.DISP_DIR, struct.pack('<I', int(direction)))
 
     def set_vibro_ctrl(self, ctrls: List[CTRL]) -> None:
-        flags = 0
-        for c in ctrls:
-            assert c != CTRL.CLICKS, 'CTRL.CLICKS not supported for vibro'
-            flags |= int(c)
-        self.write_request(VSFR.VIBRO_CTRL, struct.pack('<I', flags))
+        flags = reduce(or_, ctrls, CTRL(0))
+        # checked on the combined mask, an IntFlag item may already carry several flags
+        assert not flags & CTRL.CLICKS, 'CTRL.CLICKS not supported for vibro'
+        self.write_request(VSFR.VIBRO_CTRL, struct.pack('<I', int(flags)))
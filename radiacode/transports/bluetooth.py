@@ -1,11 +1,44 @@
 import struct
 import platform
+from typing import Optional
+
+SERVICE_UUID = 'e63215e5-7003-49d8-96b0-b024798fb901'
+WRITE_UUID = 'e63215e6-7003-49d8-96b0-b024798fb901'
+NOTIFY_UUID = 'e63215e7-7003-49d8-96b0-b024798fb901'
+
+_RESPONSE_LENGTH = struct.Struct('<I')
 
 
 class DeviceNotFound(Exception):
     pass
 
 
+class ResponseAssembler:
+    """Rebuilds a length-prefixed response from BLE notification chunks, shared by all Bluetooth transports"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self._buffer = bytearray()
+        self._size = 0
+
+    def feed(self, data) -> Optional[bytearray]:
+        """Consumes one notification, returns the response payload once it is complete"""
+        if self._size == 0:
+            self._size = 4 + _RESPONSE_LENGTH.unpack_from(data)[0]
+            self._buffer = bytearray(data[4:])
+        else:
+            self._buffer.extend(data)
+        self._size -= len(data)
+        assert self._size >= 0
+        if self._size != 0:
+            return None
+        response = self._buffer
+        self._buffer = bytearray()
+        return response
+
+
 if platform.system() == 'Darwin':
 
     class Bluetooth:
@@ -18,8 +51,7 @@ else:
 
     class Bluetooth(DefaultDelegate):
         def __init__(self, mac):
-            self._resp_buffer = b''
-            self._resp_size = 0
+            self._assembler = ResponseAssembler()
             self._response = None
 
             try:
@@ -29,24 +61,21 @@ else:
 
             self.p.withDelegate(self)
 
-            service = self.p.getServiceByUUID('e63215e5-7003-49d8-96b0-b024798fb901')
-            self.write_fd = service.getCharacteristics('e63215e6-7003-49d8-96b0-b024798fb901')[0].getHandle()
-            notify_fd = service.getCharacteristics('e63215e7-7003-49d8-96b0-b024798fb901')[0].getHandle()
+            service = self.p.getServiceByUUID(SERVICE_UUID)
+            self.write_fd = service.getCharacteristics(WRITE_UUID)[0].getHandle()
+            notify_fd = service.getCharacteristics(NOTIFY_UUID)[0].getHandle()
             self.p.writeCharacteristic(notify_fd + 1, b'\x01\x00')
 
         def handleNotification(self, chandle, data):
-            if self._resp_size == 0:
-                self._resp_size = 4 + struct.unpack('<i', data[:4])[0]
-                self._resp_buffer = data[4:]
-            else:
-                self._resp_buffer += data
-            self._resp_size -= len(data)
-            assert self._resp_size >= 0
-            if self._resp_size == 0:
-                self._response = self._resp_buffer
-                self._resp_buffer = b''
+            response = self._assembler.feed(data)
+            if response is not None:
+                self._response = response
 
         def execute(self, req) -> BytesBuffer:
+            # a late notification from a previous (failed) request must not leak into this one
+            self._assembler.reset()
+            self._response = None
+
             for pos in range(0, len(req), 18):
                 rp = req[pos : min(pos + 18, len(req))]
                 self.p.writeCharacteristic(self.write_fd, rp)
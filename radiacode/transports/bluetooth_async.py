@@ -0,0 +1,92 @@
+import asyncio
+import threading
+from typing import Optional
+
+from bleak import BleakClient
+from bleak.exc import BleakError
+
+from radiacode.bytes_buffer import BytesBuffer
+from radiacode.transports.bluetooth import NOTIFY_UUID, WRITE_UUID, DeviceNotFound, ResponseAssembler
+
+
+class BluetoothAsync:
+    """Bluetooth transport based on bleak, works on Linux and MacOS.
+
+    Notifications complete an asyncio.Future instead of being polled. The event loop is private
+    to the transport and runs in its own thread, so the synchronous RadiaCode API stays unchanged
+    and can also be called from a coroutine of an already running loop.
+    """
+
+    def __init__(self, mac, timeout: float = 5.0):
+        self._timeout = timeout
+        self._assembler = ResponseAssembler()
+        self._response: Optional[asyncio.Future] = None
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='radiacode-bleak', daemon=True)
+        self._thread.start()
+        try:
+            self._run(self._connect(mac))
+        except Exception as ex:
+            self._run(self._disconnect())
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            if isinstance(ex, (BleakError, asyncio.TimeoutError)):
+                raise DeviceNotFound('Device not found or bluetooth adapter is not powered on') from ex
+            raise
+
+    def _run(self, coro):
+        # blocks the calling thread only, never the loop the caller may be running in
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    async def _connect(self, mac):
+        self._client = BleakClient(mac)
+        await self._client.connect()
+        write_char = self._client.services.get_characteristic(WRITE_UUID)
+        if write_char is None:
+            await self._client.disconnect()
+            raise DeviceNotFound(f'Connected device has no write characteristic {WRITE_UUID}, is it a RadiaCode?')
+        await self._client.start_notify(NOTIFY_UUID, self._handle_notification)
+        # BlueZ reports the default 23-byte MTU until the negotiated one is acquired explicitly;
+        # private bleak API, older BlueZ versions may not support it, then the reported MTU is used
+        if self._client._backend.__class__.__name__ == 'BleakClientBlueZDBus':
+            try:
+                await self._client._backend._acquire_mtu()
+            except Exception:
+                pass
+        # largest chunk the link accepts in a single write without response (MTU - 3)
+        self._max_write = write_char.max_write_without_response_size
+
+    async def _disconnect(self):
+        # best effort cleanup after a failed connect, the link may be down already
+        client = getattr(self, '_client', None)
+        if client is not None and client.is_connected:
+            try:
+                await client.disconnect()
+            except Exception:
+                pass
+
+    def _handle_notification(self, _sender, data: bytearray):
+        # some bleak backends invoke callbacks outside of the event loop thread, the chunk is assembled
+        # on the loop thread, where _execute() resets the assembler and sets up the response future
+        self._loop.call_soon_threadsafe(self._on_data, bytes(data))
+
+    def _on_data(self, data: bytes):
+        response = self._assembler.feed(data)
+        if response is not None and self._response is not None and not self._response.done():
+            self._response.set_result(response)
+
+    async def _execute(self, req: bytes) -> bytearray:
+        # a late notification from a previous (failed) request must not leak into this one
+        self._assembler.reset()
+        response = self._response = self._loop.create_future()
+        for pos in range(0, len(req), self._max_write):
+            await self._client.write_gatt_char(WRITE_UUID, req[pos : pos + self._max_write], response=False)
+        try:
+            return await asyncio.wait_for(response, timeout=self._timeout)
+        except asyncio.TimeoutError as ex:
+            # drop the partial response, the next request starts from scratch
+            self._assembler.reset()
+            raise TimeoutError(f'No response from device in {self._timeout} seconds') from ex
+
+    def execute(self, req) -> BytesBuffer:
+        return BytesBuffer(self._run(self._execute(req)))
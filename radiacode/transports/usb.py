@@ -3,6 +3,8 @@ import usb.core
 
 from radiacode.bytes_buffer import BytesBuffer
 
+_RESPONSE_LENGTH = struct.Struct('<I')
+
 
 class DeviceNotFound(Exception):
     pass
@@ -32,17 +34,19 @@ class Usb:
             raise DeviceNotFound
         while True:
             try:
-                self._device.read(0x81, 256, timeout=100)
+                # drop stale data left from a previous session, large reads converge in few iterations
+                self._device.read(0x81, 65536, timeout=20)
             except usb.core.USBTimeoutError:
                 break
 
     def execute(self, request: bytes) -> BytesBuffer:
         self._device.write(0x1, request)
+        read = self._device.read
 
         trials = 0
         max_trials = 3
         while trials < max_trials:  # repeat until non-zero lenght data received
-            data = self._device.read(0x81, 256, timeout=self._timeout_ms).tobytes()
+            data = read(0x81, 256, timeout=self._timeout_ms)
             if len(data) != 0:
                 break
             else:
@@ -50,11 +54,11 @@ class Usb:
         if trials >= max_trials:
             raise MultipleUSBReadFailure(str(trials) + ' USB Read Failures in sequence')
 
-        response_length = struct.unpack_from('<I', data)[0]
-        data = data[4:]
+        response_length = _RESPONSE_LENGTH.unpack_from(data)[0]
+        # read() returns array('B'), append it to the bytearray in place without .tobytes() copies
+        response = bytearray(data[4:])
 
-        while len(data) < response_length:
-            r = self._device.read(0x81, response_length - len(data)).tobytes()
-            data += r
+        while len(response) < response_length:
+            response += read(0x81, response_length - len(response))
 
-        return BytesBuffer(data)
+        return BytesBuffer(response)
@@ -1,10 +1,15 @@
 import datetime
+import sys
 from dataclasses import dataclass
-from enum import Enum
+from enum import IntEnum, IntFlag
 from typing import List
 
+# records are created for every sample read from the device, slots make them smaller and faster to access;
+# dataclass(slots=True) requires python 3.10
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+
+@dataclass(**_SLOTS)
 class RealTimeData:
     dt: datetime.datetime
     count_rate: float
@@ -15,14 +20,14 @@ class RealTimeData:
     real_time_flags: int
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class RawData:
     dt: datetime.datetime
     count_rate: float
     dose_rate: float
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class DoseRateDB:
     dt: datetime.datetime
     count: int
@@ -32,7 +37,7 @@ class DoseRateDB:
     flags: int
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class RareData:
     dt: datetime.datetime
     duration: int  # for dose, in seconds
@@ -42,7 +47,7 @@ class RareData:
     flags: int
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class Event:
     dt: datetime.datetime
     event: int
@@ -50,7 +55,7 @@ class Event:
     flags: int
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class Spectrum:
     duration: datetime.timedelta
     a0: float
@@ -59,16 +64,13 @@ class Spectrum:
     counts: List[int]
 
 
-class DisplayDirection(Enum):
+class DisplayDirection(IntEnum):
     AUTO = 0
     RIGHT = 1
     LEFT = 2
 
-    def __int__(self) -> int:
-        return self.value
-
 
-class VSFR(Enum):
+class VSFR(IntEnum):
     DEVICE_CTRL = 1280
     DEVICE_ON = 1283
     DEVICE_LANG = 1282
@@ -99,11 +101,8 @@ class VSFR(Enum):
     MS_RUN = 1539
     DOSE_RESET = 32775
 
-    def __int__(self) -> int:
-        return self.value
-
 
-class VS(Enum):
+class VS(IntEnum):
     CONFIGURATION = 2
     TEXT_MESSAGE = 15
     DATA_BUF = 256
@@ -115,11 +114,8 @@ class VS(Enum):
     # UNKNOWN_13 = 13
     # UNKNOWN_240 = 240
 
-    def __int__(self) -> int:
-        return self.value
 
-
-class CTRL(Enum):
+class CTRL(IntFlag):
     BUTTONS = 1 << 0
     CLICKS = 1 << 1
     DOSE_RATE_ALARM_1 = 1 << 2
@@ -128,6 +124,3 @@ class CTRL(Enum):
     DOSE_ALARM_1 = 1 << 5
     DOSE_ALARM_2 = 1 << 6
     DOSE_OUT_OF_SCALE = 1 << 7
-
-    def __int__(self) -> int:
-        return self.value